@@ -1,53 +1,107 @@
+import mmap
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 """Module for handling file writing operations in Git Repository Explorer."""
 
+SEP = "=" * 48
+HEADER_FMT = "\n" + SEP + "\nFile: %s\n" + SEP + "\n"
+STRUCTURE_HEADING = "Directory structure:\n"
+CONTENTS_HEADING = "\nFiles Content:\n"
+MMAP_THRESHOLD = 8 << 20  # Outputs above 8MB are copied through mmap
+PREFETCH_WINDOW = 32  # File reads kept in flight ahead of the writer
+
 
 class FileWriter:
     """Handles writing repository contents to a file."""
 
-    def __init__(self, repo_handler, selected_files):
+    def __init__(self, repo_handler, selected_files, structure=None):
         self.repo_handler = repo_handler
+        self.structure = structure  # Fetched from repo_handler when None
+        self.set_selected_files(selected_files)
+
+    def set_selected_files(self, selected_files):
+        """Set the files to write and cache their sorted order."""
         self.selected_files = selected_files
+        self._sorted_files = sorted(selected_files)
 
     def save_to_file(self, output_file):
         """Save repository structure and contents to the specified file."""
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("Directory structure:\n")
+        parts = [STRUCTURE_HEADING]
+        structure = self.structure
+        if structure is None:
             structure = self.repo_handler.get_repo_structure()
-            self._write_structure(f, structure)
-            f.write("\nFiles Content:\n")
-            all_files = self._get_all_files(structure)
-            self.selected_files = self.selected_files or all_files
-            self._write_file_contents(f)
-
-    def _write_structure(self, file, structure, prefix=""):
-        """Write directory structure to the file."""
-        for name, content in structure.items():
-            if isinstance(content, dict):
-                file.write(f"{prefix}└── {name}/\n")
-                self._write_structure(file, content, prefix + "    ")
+        all_files = self._emit_structure(parts, structure)
+        parts.append(CONTENTS_HEADING)
+        if not self._sorted_files:
+            self.set_selected_files(all_files)
+        self._emit_file_contents(parts)
+        data = "".join(parts).encode("utf-8")
+        self._write_output(output_file, data)
+
+    def _write_output(self, output_file, data):
+        """Write the encoded output through a raw file descriptor."""
+        flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        fd = os.open(output_file, flags, 0o644)
+        try:
+            if len(data) > MMAP_THRESHOLD:
+                self._write_mmap(fd, data)
             else:
-                file.write(f"{prefix}    ├── {name}\n")
+                self._write_fd(fd, data)
+        finally:
+            os.close(fd)
 
-    def _write_file_contents(self, file):
-        """Write contents of selected files to the output file."""
-        for file_path in sorted(self.selected_files):
-            content = self.repo_handler.get_file_content(file_path)
-            file.write(f"\n{'=' * 48}\nFile: {file_path}\n{'=' * 48}\n")
-            file.write(f"{content}\n")
+    def _write_fd(self, fd, data):
+        """Write all bytes to the descriptor, retrying on short writes."""
+        view = memoryview(data)
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
 
-    def _get_all_files(self, structure, prefix=""):
-        """Get all files from the structure recursively."""
+    def _write_mmap(self, fd, data):
+        """Copy the bytes into a memory map of the pre-sized file."""
+        os.ftruncate(fd, len(data))
+        with mmap.mmap(fd, len(data), access=mmap.ACCESS_WRITE) as mm:
+            mm[:] = data
+            mm.flush()
+
+    def _emit_structure(self, parts, structure, prefix=""):
+        """Append directory structure lines and return all file paths."""
         files = set()
-        for name, content in structure.items():
-            full_path = os.path.join(prefix, name) if prefix else name
-            if isinstance(content, dict):
-                files.update(self._get_all_files(content, full_path))
+        stack = [(prefix, "", iter(structure.items()))]
+        while stack:
+            prefix, path, items = stack[-1]
+            for name, content in items:
+                full_path = path + os.sep + name if path else name
+                if content is None:
+                    parts.append(f"{prefix}    ├── {name}\n")
+                    files.add(full_path)
+                    continue
+                parts.append(f"{prefix}└── {name}/\n")
+                stack.append((prefix + "    ", full_path, iter(content.items())))
+                break
             else:
-                files.add(full_path)
+                stack.pop()
         return files
 
+    def _emit_file_contents(self, parts):
+        """Append contents of selected files, prefetching reads in a pool."""
+        paths = self._sorted_files
+        read = self.repo_handler.get_file_content
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque(executor.submit(read, p) for p in paths[:PREFETCH_WINDOW])
+            for index, file_path in enumerate(paths):
+                content = pending.popleft().result()
+                if index + PREFETCH_WINDOW < len(paths):
+                    pending.append(
+                        executor.submit(read, paths[index + PREFETCH_WINDOW])
+                    )
+                parts.append(HEADER_FMT % file_path)
+                parts.append(content)
+                parts.append("\n")
+
     def get_user_home_directory(self):
         """Gets the current Windows user's home directory."""
         return os.path.expanduser("~")
@@ -1,9 +1,15 @@
+from array import array
 import tkinter as tk
+from tkinter import font as tkfont
 from tkinter import ttk
 import os
 
 """Module for managing the GUI in Git Repository Explorer."""
 
+ROW_INSET = 2  # Canvas border width; rows are drawn inside it
+WHEEL_ROWS = 3  # Rows scrolled per mouse wheel notch
+_SEP = os.sep
+
 
 class RepositoryGUI:
     """Handles the graphical user interface for the repository explorer."""
@@ -14,6 +20,15 @@ class RepositoryGUI:
         self.process_callback = process_callback
         self.item_tags = []  # Track tags for each item
         self.item_full_paths = []  # Track full paths for each item
+        self._display_texts = []  # Track tree-formatted text for each item
+        self.row_is_dir = array("b")  # 1 for directory items, 0 for files
+        self.folder_range = {}  # Folder path -> [start, end) item indices
+        self._first_row = 0  # Index of the item drawn at the top
+        self._row_items = []  # Canvas text items, one per viewport slot
+        self._dirty_rows = set()  # Items retagged since the last flush
+        self._full_redraw = False  # Whether the next flush repaints all slots
+        self._flush_pending = False
+        self._busy = False  # A background task is running
         self.create_widgets()
 
     def create_widgets(self):
@@ -76,35 +91,41 @@ class RepositoryGUI:
         )
         self.toggle_button.pack(side="right", padx=10)
 
-        # Listbox with integrated scrollbar
-        self.listbox_frame = ttk.Frame(self.main_frame, style="Main.TFrame")
-        self.listbox_frame.pack(fill="both", expand=True)
+        # Shown only while a background task runs
+        self.progress_bar = ttk.Progressbar(
+            self.main_frame, orient="horizontal", mode="indeterminate", length=300
+        )
+
+        # Virtual list: only the rows inside the viewport are drawn
+        self.list_frame = ttk.Frame(self.main_frame, style="Main.TFrame")
+        self.list_frame.pack(fill="both", expand=True)
 
-        self.listbox = tk.Listbox(
-            self.listbox_frame,
-            font=("Consolas", 11),
+        self.row_font = tkfont.Font(family="Consolas", size=11)
+        self.strike_font = tkfont.Font(family="Consolas", size=11, overstrike=1)
+        self._row_h = self.row_font.metrics("linespace")  # Fixed per font
+        self._viewport_h = 15 * self._row_h + 2 * ROW_INSET  # Until <Configure>
+        self.canvas = tk.Canvas(
+            self.list_frame,
             bg="#D8E2DC",
-            fg="#2B2D42",
-            selectmode="none",
             relief="solid",
-            borderwidth=2,
+            borderwidth=ROW_INSET,
             highlightthickness=0,
-            activestyle="none",
-            selectbackground="#FFB4A2",
-            selectforeground="#2B2D42",
-            height=15,
+            height=15 * self._row_h,
         )
-        self.listbox.pack(side="left", fill="both", expand=True)
+        self.canvas.pack(side="left", fill="both", expand=True)
 
-        scrollbar = ttk.Scrollbar(
-            self.listbox_frame,
+        self.scrollbar = ttk.Scrollbar(
+            self.list_frame,
             orient="vertical",
-            command=self.listbox.yview,
+            command=self.yview,
             style="Vertical.TScrollbar",
         )
-        scrollbar.pack(side="right", fill="y")
-        self.listbox.config(yscrollcommand=scrollbar.set)
-        self.listbox.bind("<Button-1>", self.app.on_file_select)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", self._on_mousewheel)
+        self.canvas.bind("<Button-5>", self._on_mousewheel)
+        self.canvas.bind("<Button-1>", self.app.on_file_select)
 
         self.save_button = ttk.Button(
             self.main_frame,
@@ -123,31 +144,166 @@ class RepositoryGUI:
             self.process_callback(repo_path, branch)
 
     def display_structure(self, structure):
-        """Display the repository structure in the listbox."""
-        self.listbox.delete(0, tk.END)
-        self.item_full_paths = []
-        self.item_tags = []
-        self._populate_listbox(structure)
+        """Display the repository structure in the virtual list."""
+        display_texts, paths, row_is_dir, folder_range = self._populate_rows(structure)
+        self._display_texts = display_texts
+        self.item_full_paths = paths
+        self.row_is_dir = row_is_dir
+        self.folder_range = folder_range
+        self.item_tags = [()] * len(paths)
+        self._first_row = 0
+        self._schedule_redraw()
         self.toggle_button["state"] = "normal"
 
-    def _populate_listbox(self, structure, prefix="", path_prefix=""):
-        """Populate the listbox with tree-like structure."""
-        for name, content in structure.items():
-            full_path = os.path.join(path_prefix, name) if path_prefix else name
-            if isinstance(content, dict):
-                display_name = f"{prefix}└── {name}/"
-                self.listbox.insert(tk.END, display_name)
-                self.item_full_paths.append(full_path)
-                self.item_tags.append(())
-                self._populate_listbox(content, prefix + "    ", full_path)
+    def _populate_rows(self, structure):
+        """Build list rows for the tree-like structure without tk calls."""
+        display_texts, paths, row_is_dir, folder_range = [], [], array("b"), {}
+        stack = [("", "", None, iter(structure.items()))]
+        while stack:
+            prefix, path_prefix, start, items = stack[-1]
+            for name, content in items:
+                full_path = path_prefix + name
+                paths.append(full_path)
+                if content is None:
+                    display_texts.append(f"{prefix}    ├── {name}")
+                    row_is_dir.append(0)
+                    continue
+                display_texts.append(f"{prefix}└── {name}/")
+                row_is_dir.append(1)
+                stack.append(
+                    (
+                        prefix + "    ",
+                        full_path + _SEP,
+                        len(paths) - 1,
+                        iter(content.items()),
+                    )
+                )
+                break
             else:
-                display_name = f"{prefix}    ├── {name}"
-                self.listbox.insert(tk.END, display_name)
-                self.item_full_paths.append(full_path)
-                self.item_tags.append(())
+                stack.pop()
+                if start is not None:
+                    folder_range[paths[start]] = (start, len(paths))
+        return display_texts, paths, row_is_dir, folder_range
+
+    def row_at(self, y):
+        """Return the index of the item at canvas height y, or -1."""
+        index = self._first_row + (y - ROW_INSET) // self._row_h
+        return index if 0 <= index < len(self._display_texts) else -1
+
+    def yview(self, *args):
+        """Scroll the viewport in response to scrollbar commands."""
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self._display_texts)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._visible_rows()
+            self._scroll_to(self._first_row + step)
+
+    def _on_mousewheel(self, event):
+        """Scroll the viewport by a few rows per wheel notch."""
+        up = event.num == 4 or event.delta > 0
+        self._scroll_to(self._first_row + (-WHEEL_ROWS if up else WHEEL_ROWS))
+
+    def _on_resize(self, event):
+        """Remember the new viewport height and repaint."""
+        self._viewport_h = event.height
+        self._schedule_redraw()
+
+    def _scroll_to(self, first_row):
+        """Move the viewport so first_row is drawn at the top."""
+        last_start = len(self._display_texts) - self._visible_rows()
+        self._first_row = max(0, min(first_row, last_start))
+        self._schedule_redraw()
+
+    def _schedule_redraw(self, index=None):
+        """Queue a repaint of one item, or of the viewport, for idle time."""
+        if index is None:
+            self._full_redraw = True
+        else:
+            self._dirty_rows.add(index)
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.root.after_idle(self._flush)
+
+    def _flush(self):
+        """Apply all queued repaints in one pass."""
+        self._flush_pending = False
+        if self._full_redraw:
+            self._redraw()
+        else:
+            for index in self._dirty_rows:
+                slot = index - self._first_row
+                if 0 <= slot < len(self._row_items):
+                    self.canvas.itemconfigure(
+                        self._row_items[slot], font=self._item_font(index)
+                    )
+        self._full_redraw = False
+        self._dirty_rows.clear()
+
+    def _visible_rows(self):
+        """Return how many whole rows fit in the viewport."""
+        return max(1, (self._viewport_h - 2 * ROW_INSET) // self._row_h)
+
+    def _redraw(self):
+        """Draw the items that fall inside the viewport."""
+        row_h = self._row_h
+        visible = self._visible_rows()
+        total = len(self._display_texts)
+        self._first_row = max(0, min(self._first_row, total - visible))
+        slots = visible + 1  # Include a partially visible last row
+        while len(self._row_items) < slots:
+            self._row_items.append(
+                self.canvas.create_text(
+                    ROW_INSET + 4,
+                    ROW_INSET + len(self._row_items) * row_h,
+                    anchor="nw",
+                    font=self.row_font,
+                    fill="#2B2D42",
+                )
+            )
+        for slot, item in enumerate(self._row_items):
+            index = self._first_row + slot
+            if slot < slots and index < total:
+                self.canvas.itemconfigure(
+                    item,
+                    text=self._display_texts[index],
+                    font=self._item_font(index),
+                    state="normal",
+                )
+            else:
+                self.canvas.itemconfigure(item, state="hidden")
+        if total:
+            self.scrollbar.set(
+                self._first_row / total, min(1.0, (self._first_row + visible) / total)
+            )
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _item_font(self, index):
+        """Return the font to draw an item with, honouring its tags."""
+        if "strikethrough" in self.item_tags[index]:
+            return self.strike_font
+        return self.row_font
+
+    def set_busy(self, busy):
+        """Lock the action buttons and show progress while a task runs."""
+        self._busy = busy
+        state = "disabled" if busy else "normal"
+        self.process_button["state"] = state
+        if busy:
+            self.save_button["state"] = "disabled"
+            self.progress_bar.pack(before=self.list_frame, pady=(0, 15))
+            self.progress_bar.start(15)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.pack_forget()
+        self.root.config(cursor="watch" if busy else "")
 
     def update_save_button_state(self, enabled):
         """Enable or disable the save button based on selection."""
+        if self._busy:
+            return  # Stays locked until the task finishes
         self.save_button["state"] = "normal" if enabled else "disabled"
 
     def get_item_text(self, index):
@@ -156,15 +312,18 @@ class RepositoryGUI:
 
     def set_item_tags(self, index, tags):
         """Set visual tags (e.g., strikethrough) for an item."""
-        text = self.listbox.get(index).replace("\u0336", "")
         self.item_tags[index] = tags
-        if "strikethrough" in tags:
-            striked_text = "".join(c + "\u0336" for c in text)
-            self.listbox.delete(index)
-            self.listbox.insert(index, striked_text)
-        else:
-            self.listbox.delete(index)
-            self.listbox.insert(index, text)
+        self._schedule_redraw(index)
+
+    def set_all_tags(self, tags):
+        """Set the same visual tags for every item."""
+        self.item_tags = [tags] * len(self._display_texts)
+        self._schedule_redraw()
+
+    def set_range_tags(self, start, end, tags):
+        """Set the same visual tags for items [start, end)."""
+        self.item_tags[start:end] = [tags] * (end - start)
+        self._schedule_redraw()
 
     def get_item_tags(self, index):
         """Get the tags for an item at the given index."""
@@ -1,4 +1,7 @@
 import os
+import queue
+import threading
+import weakref
 import tkinter as tk
 from tkinter import ttk, messagebox
 from gui import RepositoryGUI
@@ -7,6 +10,56 @@ from file_writer import FileWriter
 
 """Module for running the main application of Git Repository Explorer."""
 
+POLL_MS = 50  # How often the Tk thread checks for finished background tasks
+_STYLED_ROOTS = weakref.WeakSet()  # Tk roots whose interpreter has our styles
+
+_STYLE_SPECS = {
+    "Main.TFrame": {"background": "#F5F6CE"},  # Soft cream
+    "Heading.TLabel": {
+        "font": ("Consolas", 16, "bold"),
+        "background": "#F5F6CE",
+        "foreground": "#2B2D42",  # Dark slate
+    },
+    "Subheading.TLabel": {
+        "font": ("Consolas", 12, "bold"),
+        "background": "#F5F6CE",
+        "foreground": "#2B2D42",
+    },
+    "Primary.TButton": {
+        "font": ("Consolas", 12, "bold"),
+        "background": "#FFB4A2",  # Soft peach
+        "foreground": "#2B2D42",  # Dark slate for contrast
+        "borderwidth": 3,
+        "relief": "raised",
+        "padding": 12,
+    },
+    "Secondary.TButton": {
+        "font": ("Consolas", 12, "bold"),
+        "background": "#A9DEF9",  # Light sky blue
+        "foreground": "#2B2D42",  # Dark slate for contrast
+        "borderwidth": 3,
+        "relief": "raised",
+        "padding": 12,
+    },
+    "Vertical.TScrollbar": {
+        "background": "#D8E2DC",  # Match file list
+        "troughcolor": "#F5F6CE",
+        "borderwidth": 2,
+        "relief": "solid",
+    },
+}
+
+_STYLE_MAPS = {
+    "Primary.TButton": {
+        "background": [("active", "#E59887")],
+        "relief": [("pressed", "sunken")],
+    },
+    "Secondary.TButton": {
+        "background": [("active", "#8CCDE8")],
+        "relief": [("pressed", "sunken")],
+    },
+}
+
 
 class GitRepoApp:
     """Main application class managing the repository explorer functionality."""
@@ -18,178 +71,186 @@ class GitRepoApp:
         self.setup_styles()
         self.gui = RepositoryGUI(self.root, self, self.process_repo)
         self.repo_handler = None
-        self.selected_files = set()
+        self.selected = bytearray()  # 1 per selected file item, by row index
+        self._selected_count = 0
+        self._file_mask = b""  # 1 per file item, 0 per directory item
         self.structure = {}
+        self._output_path = None  # Resolved on first save
         self.all_selected = True  # Track toggle state
+        self._results = queue.Queue()  # (callback, args) from worker threads
+        self._pending_tasks = 0
 
     def setup_styles(self):
-        """Configure the visual styles for the application."""
-        style = ttk.Style()
-        style.configure("Main.TFrame", background="#F5F6CE")  # Soft cream
-        style.configure(
-            "Heading.TLabel",
-            font=("Consolas", 16, "bold"),
-            background="#F5F6CE",
-            foreground="#2B2D42",  # Dark slate
-        )
-        style.configure(
-            "Subheading.TLabel",
-            font=("Consolas", 12, "bold"),
-            background="#F5F6CE",
-            foreground="#2B2D42",
-        )
-        style.configure(
-            "Primary.TButton",
-            font=("Consolas", 12, "bold"),
-            background="#FFB4A2",  # Soft peach
-            foreground="#2B2D42",  # Dark slate for contrast
-            borderwidth=3,
-            relief="raised",
-            padding=12,
-        )
-        style.map(
-            "Primary.TButton",
-            background=[("active", "#E59887")],
-            relief=[("pressed", "sunken")],
-        )
-        style.configure(
-            "Secondary.TButton",
-            font=("Consolas", 12, "bold"),
-            background="#A9DEF9",  # Light sky blue
-            foreground="#2B2D42",  # Dark slate for contrast
-            borderwidth=3,
-            relief="raised",
-            padding=12,
-        )
-        style.map(
-            "Secondary.TButton",
-            background=[("active", "#8CCDE8")],
-            relief=[("pressed", "sunken")],
-        )
-        style.configure(
-            "Vertical.TScrollbar",
-            background="#D8E2DC",  # Match listbox
-            troughcolor="#F5F6CE",
-            borderwidth=2,
-            relief="solid",
-        )
+        """Configure the visual styles once per Tk interpreter."""
+        if self.root in _STYLED_ROOTS:
+            return
+        style = ttk.Style(self.root)
+        for name, spec in _STYLE_SPECS.items():
+            style.configure(name, **spec)
+        for name, spec in _STYLE_MAPS.items():
+            style.map(name, **spec)
+        _STYLED_ROOTS.add(self.root)
 
     def process_repo(self, repo_path, branch=None):
-        """Process the repository and update the GUI."""
-        self.repo_handler = RepositoryHandler(repo_path, branch)
-        self.structure = self.repo_handler.get_repo_structure()
+        """Load the repository on a worker thread and update the GUI."""
+        self._run_in_background(self._load_repo, repo_path, branch)
+
+    def _run_in_background(self, target, *args):
+        """Start a worker thread and poll for its result on the UI thread."""
+        self.gui.set_busy(True)
+        self._pending_tasks += 1
+        threading.Thread(target=target, args=args, daemon=True).start()
+        if self._pending_tasks == 1:
+            self.root.after(POLL_MS, self._poll_results)
+
+    def _poll_results(self):
+        """Run callbacks posted by worker threads; runs on the UI thread."""
+        while True:
+            try:
+                callback, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending_tasks -= 1
+            callback(*args)
+        if self._pending_tasks:
+            self.root.after(POLL_MS, self._poll_results)
+
+    def _finish_task(self):
+        """Unlock the GUI once no background task is left running."""
+        if not self._pending_tasks:
+            self.gui.set_busy(False)
+
+    def _load_repo(self, repo_path, branch):
+        """Open the repository and index its structure off the UI thread."""
+        try:
+            handler = RepositoryHandler(repo_path, branch)
+            structure = handler.get_repo_structure()
+        except Exception as e:
+            self._results.put((self._on_task_failed, (e,)))
+            return
+        self._results.put((self._on_repo_ready, (handler, structure)))
+
+    def _on_repo_ready(self, handler, structure):
+        """Show a loaded repository; runs on the UI thread."""
+        self._finish_task()
+        if self.repo_handler is not None:
+            self.repo_handler.close()
+        self.repo_handler = handler
+        self.structure = structure
         self.gui.display_structure(self.structure)
-        self.selected_files = self._get_all_files(self.structure)
+        self._file_mask = bytes(not is_dir for is_dir in self.gui.row_is_dir)
+        self._select_all_files()
         self.all_selected = True
         self._update_all_visuals()
         self.gui.update_save_button_state(True)
 
-    def _get_all_files(self, structure, prefix=""):
-        """Get all file paths from the repository structure."""
-        files = set()
-        for name, content in structure.items():
-            full_path = os.path.join(prefix, name) if prefix else name
-            if isinstance(content, dict):
-                files.update(self._get_all_files(content, full_path))
-            else:
-                files.add(full_path)
-        return files
+    def _select_all_files(self):
+        """Mark every file item as selected."""
+        self.selected = bytearray(self._file_mask)
+        self._selected_count = self.selected.count(1)
+
+    def _selected_paths(self):
+        """Return the paths of all selected file items."""
+        paths = self.gui.item_full_paths
+        return [paths[i] for i, flag in enumerate(self.selected) if flag]
 
     def on_file_select(self, event):
-        """Handle file selection events in the listbox."""
-        index = self.gui.listbox.nearest(event.y)
+        """Handle file selection events in the file list."""
+        index = self.gui.row_at(event.y)
         if index < 0:
             return
-        full_path = self.gui.get_item_text(index)
-        is_dir = self._is_directory(full_path)
         is_selected = "strikethrough" not in self.gui.get_item_tags(index)
 
-        if is_dir:
+        if self.gui.row_is_dir[index]:
+            full_path = self.gui.get_item_text(index)
             if is_selected:
                 self._deselect_folder(full_path)
             else:
                 self._select_folder(full_path)
         else:
             if is_selected:
-                self._deselect_file(index, full_path)
+                self._deselect_file(index)
             else:
-                self._select_file(index, full_path)
-        self.gui.update_save_button_state(len(self.selected_files) > 0)
-
-    def _is_directory(self, path):
-        """Check if a path represents a directory."""
-        current = self.structure
-        for part in path.split(os.sep):
-            if part not in current or not isinstance(current[part], dict):
-                return False
-            current = current[part]
-        return True
-
-    def _select_file(self, index, path):
+                self._select_file(index)
+        self.gui.update_save_button_state(self._selected_count > 0)
+
+    def _select_file(self, index):
         """Select a single file and remove strikethrough."""
         self.gui.set_item_tags(index, ())
-        self.selected_files.add(path)
+        self._selected_count += 1 - self.selected[index]
+        self.selected[index] = 1
 
-    def _deselect_file(self, index, path):
+    def _deselect_file(self, index):
         """Deselect a single file and apply strikethrough."""
         self.gui.set_item_tags(index, ("strikethrough",))
-        self.selected_files.discard(path)
+        self._selected_count -= self.selected[index]
+        self.selected[index] = 0
 
     def _select_folder(self, folder_path):
         """Select a folder and all its children recursively."""
-        folder_prefix = folder_path + os.sep if folder_path else ""
-        for i in range(self.gui.listbox.size()):
-            item_path = self.gui.get_item_text(i)
-            if item_path == folder_path or (
-                folder_prefix and item_path.startswith(folder_prefix)
-            ):
-                self.gui.set_item_tags(i, ())
-                if not self._is_directory(item_path):
-                    self.selected_files.add(item_path)
+        start, end = self.gui.folder_range[folder_path]
+        self.gui.set_range_tags(start, end, ())
+        before = self.selected.count(1, start, end)
+        self.selected[start:end] = self._file_mask[start:end]
+        self._selected_count += self._file_mask.count(1, start, end) - before
 
     def _deselect_folder(self, folder_path):
         """Deselect a folder and all its children recursively."""
-        folder_prefix = folder_path + os.sep if folder_path else ""
-        for i in range(self.gui.listbox.size()):
-            item_path = self.gui.get_item_text(i)
-            if item_path == folder_path or (
-                folder_prefix and item_path.startswith(folder_prefix)
-            ):
-                self.gui.set_item_tags(i, ("strikethrough",))
-                if not self._is_directory(item_path):
-                    self.selected_files.discard(item_path)
+        start, end = self.gui.folder_range[folder_path]
+        self.gui.set_range_tags(start, end, ("strikethrough",))
+        self._selected_count -= self.selected.count(1, start, end)
+        self.selected[start:end] = bytes(end - start)
 
     def toggle_all_selection(self):
         """Toggle selection state of all items."""
         self.all_selected = not self.all_selected
         if self.all_selected:
-            self.selected_files = self._get_all_files(self.structure)
+            self._select_all_files()
         else:
-            self.selected_files.clear()
+            self.selected = bytearray(len(self.selected))
+            self._selected_count = 0
         self._update_all_visuals()
         self.gui.update_save_button_state(self.all_selected)
 
     def _update_all_visuals(self):
         """Update visual state of all items based on toggle."""
-        tags = () if self.all_selected else ("strikethrough",)
-        for i in range(self.gui.listbox.size()):
-            self.gui.set_item_tags(i, tags)
+        self.gui.set_all_tags(() if self.all_selected else ("strikethrough",))
 
     def save_to_file(self):
         """Save selected files to an output file."""
-        if not self.selected_files:
+        if not self._selected_count:
             messagebox.showwarning("Warning", "No files selected!")
             return
-        writer = FileWriter(self.repo_handler, self.selected_files)
-        user_home_directory = writer.get_user_home_directory()
-        filename = "repo_contents.txt"
-        full_filepath = os.path.join(user_home_directory, filename)
-        writer.save_to_file(full_filepath)
+        writer = FileWriter(self.repo_handler, self._selected_paths(), self.structure)
+        if self._output_path is None:
+            user_home_directory = writer.get_user_home_directory()
+            self._output_path = os.path.join(user_home_directory, "repo_contents.txt")
+        self._run_in_background(self._write_file, writer, self._output_path)
+
+    def _write_file(self, writer, full_filepath):
+        """Write the output file off the UI thread."""
+        try:
+            writer.save_to_file(full_filepath)
+        except Exception as e:
+            self._results.put((self._on_task_failed, (e,)))
+            return
+        self._results.put((self._on_file_saved, (full_filepath,)))
+
+    def _on_file_saved(self, full_filepath):
+        """Report a finished save; runs on the UI thread."""
+        self._finish_task()
+        self.gui.update_save_button_state(self._selected_count > 0)
         messagebox.showinfo(
             "Success",
-            "Repository contents saved to ${full_filepath}",
+            f"Repository contents saved to {full_filepath}",
         )
 
+    def _on_task_failed(self, error):
+        """Report a failed background task; runs on the UI thread."""
+        self._finish_task()
+        self.gui.update_save_button_state(self._selected_count > 0)
+        messagebox.showerror("Error", str(error))
+
 
 if __name__ == "__main__":
     root_window = tk.Tk()
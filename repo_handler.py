@@ -1,46 +1,148 @@
+import codecs
+import hashlib
 import os
-import re
 import shutil
+import stat
+import sys
 import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import git
 from charset_normalizer import detect
 from gitignore_parser import parse_gitignore
 
 """Module for handling repository operations in Git Repository Explorer."""
 
+# Clones land under GIT_REPO_EXPLORER_TMP when set (e.g. a tmpfs such as /dev/shm)
+CLONE_CACHE_DIR = os.path.join(
+    os.environ.get("GIT_REPO_EXPLORER_TMP") or tempfile.gettempdir(),
+    "git_repo_explorer",
+)
+CLONE_CACHE_SIZE = 5  # Remote clones kept for reuse; older ones are deleted
+MAX_FILE_SIZE = 1024 * 1024  # 1MB limit; larger files are omitted
+SNIFF_SIZE = 8 * 1024  # Leading bytes checked for NULs to spot binary files
+CONTENT_CACHE_BYTES = 64 * 1024 * 1024  # Decoded text kept for unchanged files
+IGNORE_CACHE_SIZE = 64  # Parsed .gitignore matchers kept across handlers
+_SEP = os.sep
+_READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+_O_NOATIME = getattr(os, "O_NOATIME", 0)  # Linux only
+_IGNORE_CACHE = OrderedDict()  # Repo dir -> ((mtime_ns, size), matcher)
+_IGNORE_CACHE_LOCK = threading.Lock()
+_GITHUB_PREFIX = "https://github.com/"
+# Fetch errors that blame the cached clone rather than the network or remote
+_RECLONE_FETCH_ERRORS = ("shallow", "corrupt", "bad object")
+# UTF-32 marks come first: the UTF-16 LE mark is a prefix of the UTF-32 LE one
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Signatures of binary formats that may have no NUL in their first bytes
+_BINARY_MAGIC = (
+    b"\x89PNG",  # PNG
+    b"\xff\xd8\xff",  # JPEG
+    b"GIF8",  # GIF
+    b"PK\x03\x04",  # ZIP, JAR, DOCX, ...
+    b"%PDF",  # PDF
+    b"\x7fELF",  # ELF
+    b"\x1f\x8b",  # gzip
+)
+
 
 class RepositoryHandler:
     """Manages repository cloning and content access."""
 
-    # Define common text file extensions
-    TEXT_EXTENSIONS = {
-        ".md",
-        ".txt",
-        ".py",
-        ".bat",
-        ".json",
-        ".yaml",
-        ".yml",
-        ".ini",
-        ".cfg",
-        ".sh",
-    }
-
-    def __init__(self, repo_path, branch=None):
+    # Define common text file extensions; these are tried as UTF-8 first
+    TEXT_EXTENSIONS = frozenset(
+        {
+            ".md",
+            ".txt",
+            ".py",
+            ".bat",
+            ".json",
+            ".yaml",
+            ".yml",
+            ".ini",
+            ".cfg",
+            ".sh",
+            ".rst",
+            ".toml",
+            ".csv",
+            ".xml",
+            ".html",
+            ".css",
+            ".scss",
+            ".js",
+            ".jsx",
+            ".ts",
+            ".tsx",
+            ".c",
+            ".h",
+            ".cpp",
+            ".hpp",
+            ".cs",
+            ".java",
+            ".kt",
+            ".go",
+            ".rs",
+            ".rb",
+            ".php",
+            ".sql",
+            ".ps1",
+        }
+    )
+
+    def __init__(self, repo_path, branch=None, shallow=True, skip_extensions=()):
         self._repo_path = self._strip_branch_from_url(repo_path)
         self._branch = branch
+        self._shallow = shallow  # Clone remotes without history
+        # Extensions left out of the structure (opt-in); always matched with
+        # the leading dot, so "lock" skips Cargo.lock but not padlock
+        self._skip_suffixes = tuple(
+            sorted({"." + e.lower().lstrip(".") for e in skip_extensions})
+        )
         self._temp_dir = None
         self._repo_dir = None
+        self._content_cache = {}  # Path -> ((mtime_ns, size), text)
+        self._content_bytes = 0  # Memory held by the cached texts
+        self._content_lock = threading.Lock()  # Files are read from a pool
+        self._repo = None  # git.Repo, opened once on first use
+        self._finalizer = None
         self._initialize_repository()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the git processes held by the repository object."""
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def _get_repo(self):
+        """Return the git.Repo for the repository, opening it once."""
+        if self._repo is None:
+            self._set_repo(git.Repo(self._repo_dir))
+        return self._repo
+
+    def _set_repo(self, repo):
+        """Keep the repository object, closing it when the handler goes away."""
+        self._repo = repo
+        self._finalizer = weakref.finalize(self, repo.close)
+
     def _strip_branch_from_url(self, repo_path):
         """Strip branch information from GitHub URLs."""
-        if repo_path.startswith("https://github.com"):
-            match = re.match(
-                r"(https://github\.com/[^/]+/[^/]+)(?:/tree/[^/]+)?", repo_path
-            )
-            if match:
-                base_url = match.group(1)
+        if repo_path.startswith(_GITHUB_PREFIX):
+            owner, _, rest = repo_path[len(_GITHUB_PREFIX) :].partition("/")
+            name = rest.split("/", 1)[0]  # Drops /tree/<branch> and the like
+            if owner and name:
+                base_url = _GITHUB_PREFIX + owner + "/" + name
                 return base_url + ".git" if not base_url.endswith(".git") else base_url
         return repo_path
 
@@ -57,84 +159,378 @@ class RepositoryHandler:
         if not os.path.exists(os.path.join(self._repo_dir, ".git")):
             raise ValueError(f"Path '{self._repo_path}' is not a Git repository")
         if self._branch:
-            repo = git.Repo(self._repo_dir)
-            repo.git.checkout(self._branch)
+            self._get_repo().git.checkout(self._branch)
 
     def _clone_remote_repo(self):
-        """Clone a remote repository to a temporary directory."""
-        self._temp_dir = tempfile.mkdtemp(prefix="git_repo_")
+        """Clone a remote repository, or refresh the cached clone of it."""
+        url_hash = hashlib.sha1(self._repo_path.encode("utf-8")).hexdigest()
+        self._temp_dir = os.path.join(CLONE_CACHE_DIR, url_hash)
+        refreshed = os.path.isdir(os.path.join(self._temp_dir, ".git"))
+        if not (refreshed and self._refresh_clone()):
+            self._fresh_clone()
+        os.utime(self._temp_dir)  # Most recently used; evicted last
+        self._repo_dir = self._temp_dir
+        self._evict_old_clones()
+
+    def _refresh_clone(self):
+        """Update the cached clone in place; return False if it must be recloned.
+
+        Other fetch failures, such as being offline, are raised and the
+        cached clone is kept for the next attempt.
+        """
+        try:
+            repo = git.Repo(self._temp_dir)
+        except git.GitError:
+            return False  # No longer a usable repository
+        fetch_args = ["origin", self._branch or "HEAD"]
+        if self._shallow:
+            fetch_args.insert(0, "--depth=1")
+        elif os.path.exists(os.path.join(self._temp_dir, ".git", "shallow")):
+            fetch_args.insert(0, "--unshallow")  # Cached shallow; want history
+        try:
+            repo.git.fetch(*fetch_args)
+        except git.GitCommandError as e:
+            repo.close()
+            if any(marker in str(e.stderr) for marker in _RECLONE_FETCH_ERRORS):
+                return False
+            raise
+        try:
+            repo.git.reset("--hard", "FETCH_HEAD")
+            # Leftovers would otherwise be listed by ls-files --others
+            repo.git.clean("-fdx")
+        except git.GitCommandError:
+            repo.close()
+            return False  # Damaged objects or work tree
+        self._set_repo(repo)
+        return True
+
+    def _fresh_clone(self):
+        """Clone the remote repository into the cache directory."""
+        if self._repo is not None:
+            self.close()  # Windows cannot delete files an open repository holds
+        # Drop a stale clone, or what an interrupted one left behind
+        self._remove_tree(self._temp_dir)
         clone_args = {"url": self._repo_path, "to_path": self._temp_dir}
+        if self._shallow:
+            # Only the current tree is listed and read, so skip the history
+            clone_args.update(depth=1, single_branch=True, no_tags=True)
         if self._branch:
             clone_args["branch"] = self._branch
-        git.Repo.clone_from(**clone_args)
-        self._repo_dir = self._temp_dir
+        try:
+            self._set_repo(git.Repo.clone_from(**clone_args))
+        except git.GitCommandError:
+            try:
+                self._remove_tree(self._temp_dir)
+            except OSError:
+                pass  # Removed again before the next clone
+            raise
+
+    def _evict_old_clones(self):
+        """Delete all but the CLONE_CACHE_SIZE most recently used clones."""
+        try:
+            with os.scandir(CLONE_CACHE_DIR) as it:
+                entries = [entry for entry in it if entry.is_dir()]
+        except OSError:
+            return
+        clones = []
+        for entry in entries:
+            try:
+                clones.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue  # Removed by another instance meanwhile
+        clones.sort(reverse=True)
+        for _, path in clones[CLONE_CACHE_SIZE:]:
+            if path != self._temp_dir:
+                try:
+                    self._remove_tree(path)
+                except OSError:
+                    pass  # In use by another instance; tried again next time
+
+    def _remove_tree(self, path):
+        """Delete a directory tree, including the read-only files git writes."""
+
+        def make_writable(func, failed_path, _):
+            if not os.path.lexists(failed_path):
+                return  # Already gone
+            os.chmod(failed_path, stat.S_IWRITE)
+            func(failed_path)
+
+        if sys.version_info >= (3, 12):
+            shutil.rmtree(path, onexc=make_writable)
+        else:
+            shutil.rmtree(path, onerror=make_writable)
 
     def get_repo_structure(self):
         """Get the directory structure of the repository."""
+        try:
+            paths = self._list_repo_files()
+        except git.CommandError:
+            return self._walk_repo_structure()
         structure = {}
-        ignore_func = self._get_ignore_function()
-        for root, dirs, files in os.walk(self._repo_dir, topdown=True):
-            if ".git" in root.split(os.sep):
-                dirs[:] = []
+        levels = {"": structure}  # Directory path -> its dict
+        for path in paths:
+            if path.endswith("/"):
+                self._add_nested_repo(levels, path[:-1])
+                continue
+            dir_path, _, name = path.rpartition("/")
+            current_level = levels.get(dir_path)
+            if current_level is None:
+                current_level = self._add_level(levels, dir_path)
+            # Names like "src" or "__init__.py" repeat; share one string each
+            current_level[sys.intern(name)] = None
+        return structure
+
+    def _add_level(self, levels, dir_path):
+        """Create the dict for a directory path, and any missing parents."""
+        parent, _, name = dir_path.rpartition("/")
+        parent_level = levels.get(parent)
+        if parent_level is None:
+            parent_level = self._add_level(levels, parent)
+        current_level = levels[dir_path] = parent_level.setdefault(sys.intern(name), {})
+        return current_level
+
+    def _add_nested_repo(self, levels, dir_path):
+        """Add the files of a nested repository or submodule by walking it."""
+        top = self._repo_dir + _SEP + dir_path.replace("/", _SEP)
+        subtree = self._walk_repo_structure(top)
+        if not subtree:
+            return  # Uninitialized submodule, or nothing but ignored files
+        current_level = levels.get(dir_path)
+        if current_level is None:
+            current_level = self._add_level(levels, dir_path)
+        current_level.update(subtree)
+
+    def _list_repo_files(self):
+        """List tracked and untracked, non-ignored files present on disk.
+
+        Nested repositories and submodules, which git does not list inside,
+        are returned as their directory path with a trailing "/".
+        """
+        output = self._get_repo().git.ls_files(
+            "-z", "-t", "-s", "--cached", "--others", "--exclude-standard", "--deleted"
+        )
+        present, missing = set(), set()
+        for entry in output.split("\0"):
+            if not entry:
                 continue
-            relative_root = os.path.relpath(root, self._repo_dir)
-            abs_root = os.path.join(self._repo_dir, relative_root)
-            dirs[:] = [d for d in dirs if not ignore_func(os.path.join(abs_root, d))]
-            files = [f for f in files if not ignore_func(os.path.join(abs_root, f))]
-            self._build_structure(structure, relative_root, files)
+            status = entry[0]
+            if status == "?":
+                path = entry[2:]  # Untracked; a nested repository ends in "/"
+            else:
+                # Index entries read "<mode> <object> <stage>\t<path>"
+                meta, _, path = entry[2:].partition("\t")
+                if meta.startswith("160000"):
+                    path += "/"  # Submodule gitlink, not a file
+            # R: deleted from the work tree, S: skip-worktree (not checked out)
+            (missing if status in "RS" else present).add(path)
+        paths = present - missing
+        if self._skip_suffixes:
+            skip = self._skip_suffixes
+            paths = [path for path in paths if not path.lower().endswith(skip)]
+        return sorted(paths)
+
+    def _walk_repo_structure(self, top=None):
+        """Get the directory structure by walking the work tree, or top."""
+        structure = {}
+        ignore_func = self._get_ignore_function()
+        skip = self._skip_suffixes
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        # Breadth-first, one level at a time: (path, parent dict, name in parent)
+        level = [(top or self._repo_dir, None, None)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while level:
+                # Listing releases the GIL, so each level is listed in parallel
+                listings = executor.map(self._list_dir, [item[0] for item in level])
+                next_level = []
+                for (root, parent_level, dir_name), entries in zip(level, listings):
+                    if entries is None:
+                        continue  # Unreadable directory
+                    if parent_level is None:
+                        current_level = structure
+                    else:
+                        current_level = parent_level.setdefault(
+                            sys.intern(dir_name), {}
+                        )
+                    abs_root = root + _SEP
+                    files = []
+                    for entry in entries:
+                        name = entry.name
+                        # Cached from the directory listing; no stat on most platforms
+                        if entry.is_dir():
+                            # Like os.walk, symlinked directories are not entered
+                            if (
+                                name != ".git"
+                                and not entry.is_symlink()
+                                and not ignore_func(abs_root + name)
+                            ):
+                                next_level.append(
+                                    (abs_root + name, current_level, name)
+                                )
+                        elif skip and name.lower().endswith(skip):
+                            continue  # Cheaper than the ignore match below
+                        elif not ignore_func(abs_root + name):
+                            files.append(sys.intern(name))
+                    # One sized insert instead of growing the dict file by file
+                    current_level.update(dict.fromkeys(files))
+                level = next_level
         return structure
 
+    def _list_dir(self, path):
+        """List a directory's entries, or return None if it cannot be read."""
+        try:
+            with os.scandir(path) as it:
+                return list(it)
+        except OSError:
+            return None
+
     def _get_ignore_function(self):
-        """Create a function to check gitignore rules."""
+        """Create a function to check gitignore rules, reusing a parsed one."""
         gitignore_path = os.path.join(self._repo_dir, ".gitignore")
-        if os.path.exists(gitignore_path):
-            return parse_gitignore(gitignore_path, base_dir=self._repo_dir)
-        return lambda x: False
-
-    def _build_structure(self, structure, relative_root, files):
-        """Build the nested structure dictionary."""
-        current_level = structure
-        if relative_root != ".":
-            for part in relative_root.split(os.sep):
-                current_level = current_level.setdefault(part, {})
-        for file in files:
-            current_level[file] = False
+        try:
+            st = os.stat(gitignore_path)
+        except OSError:
+            return lambda x: False
+        key = (st.st_mtime_ns, st.st_size)
+        with _IGNORE_CACHE_LOCK:
+            cached = _IGNORE_CACHE.get(self._repo_dir)
+            if cached is not None and cached[0] == key:
+                _IGNORE_CACHE.move_to_end(self._repo_dir)
+                return cached[1]
+        matcher = parse_gitignore(gitignore_path, base_dir=self._repo_dir)
+        with _IGNORE_CACHE_LOCK:
+            _IGNORE_CACHE[self._repo_dir] = (key, matcher)
+            _IGNORE_CACHE.move_to_end(self._repo_dir)
+            if len(_IGNORE_CACHE) > IGNORE_CACHE_SIZE:
+                _IGNORE_CACHE.popitem(last=False)
+        return matcher
 
     def get_file_content(self, file_path):
-        """Get the content of a specific file."""
-        full_path = os.path.join(self._repo_dir, file_path)
+        """Get the content of a specific file, reusing it while unchanged."""
+        full_path = self._repo_dir + _SEP + file_path
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return "Unreadable file - contents omitted"
+        if st.st_size > MAX_FILE_SIZE:
+            return "File too large - contents omitted"  # Never opened
+        key = (st.st_mtime_ns, st.st_size)
+        with self._content_lock:
+            cached = self._content_cache.get(file_path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+        content = self._load_file_content(file_path, full_path, st.st_size)
+        self._cache_content(file_path, key, content)
+        return content
+
+    def _cache_content(self, file_path, key, content):
+        """Keep a file's text while the cache is within CONTENT_CACHE_BYTES."""
+        # A full cache admits nothing rather than evicting: files are re-read in
+        # the same sorted order each save, so LRU would drop every entry first
+        size = sys.getsizeof(content)
+        with self._content_lock:
+            stale = self._content_cache.pop(file_path, None)
+            if stale is not None:
+                self._content_bytes -= sys.getsizeof(stale[1])
+            if self._content_bytes + size <= CONTENT_CACHE_BYTES:
+                self._content_cache[file_path] = (key, content)
+                self._content_bytes += size
+
+    def get_file_contents_batch(self, file_paths, max_workers=8):
+        """Get the contents of several files, reading them in a thread pool."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(
+                zip(file_paths, executor.map(self.get_file_content, file_paths))
+            )
 
-        # Check file size
-        if os.path.getsize(full_path) > 1024 * 1024:  # 1MB limit
+    def _load_file_content(self, file_path, full_path, size):
+        """Read, sniff and decode a file's content."""
+        # Read once; the bytes are sniffed, detected and decoded in memory
+        try:
+            data = self._read_file_bytes(full_path, size)
+        except OSError:
+            # Gone since listing, or a directory such as a submodule checkout
+            return "Unreadable file - contents omitted"
+        if data is None:
+            return "File too large - contents omitted"  # Grew since the stat
+        if self._looks_binary(data):
             return "Binary file - contents omitted"
 
         # Check if file has a known text extension
         _, ext = os.path.splitext(file_path)
         if ext.lower() in self.TEXT_EXTENSIONS:
             try:
-                return self._read_text_file(full_path, "utf-8")
+                return self._decode_text(data, "utf-8")
             except UnicodeDecodeError:
                 # Fallback to encoding detection if UTF-8 fails
                 pass
 
         # Proceed with encoding detection for other files
-        encoding = self._detect_encoding(full_path)
-        return (
-            self._read_text_file(full_path, encoding)
-            if encoding
-            else "Binary file - contents omitted"
-        )
+        encoding = self._detect_encoding(data)
+        if encoding:
+            try:
+                return self._decode_text(data, encoding)
+            except UnicodeDecodeError:
+                pass
+        return "Binary file - contents omitted"
+
+    def _read_file_bytes(self, full_path, size):
+        """Read a whole file, or return None if it is over MAX_FILE_SIZE."""
+        fd = self._open_for_read(full_path)
+        try:
+            # One byte past the stat'ed size shows whether the file has grown
+            data = os.read(fd, size + 1)
+            limit = MAX_FILE_SIZE + 1
+            while len(data) < limit:  # Short read, or grown; stop at EOF
+                chunk = os.read(fd, limit - len(data))
+                if not chunk:
+                    break
+                data += chunk
+            return data if len(data) <= MAX_FILE_SIZE else None
+        finally:
+            os.close(fd)
+
+    def _open_for_read(self, full_path):
+        """Open a file for a raw read, without an atime update where allowed."""
+        if _O_NOATIME:
+            try:
+                return os.open(full_path, _READ_FLAGS | _O_NOATIME)
+            except PermissionError:
+                pass  # O_NOATIME needs file ownership; read normally
+        return os.open(full_path, _READ_FLAGS)
+
+    def _looks_binary(self, data):
+        """Check for a known binary signature, or NULs in the leading bytes."""
+        if data.startswith(_BINARY_MAGIC):
+            return True
+        if self._bom_encoding(data):
+            return False  # UTF-16/32 text is full of NUL bytes
+        return b"\0" in data[:SNIFF_SIZE]
 
-    def _detect_encoding(self, full_path):
-        """Detect the file encoding."""
-        with open(full_path, "rb") as f:
-            file_size = os.path.getsize(full_path)
-            sample = f.read(min(file_size, 64 * 1024))
+    def _bom_encoding(self, data):
+        """Return the encoding named by a leading byte order mark, if any."""
+        for bom, encoding in _BOM_ENCODINGS:
+            if data.startswith(bom):
+                return encoding
+        return None
+
+    def _detect_encoding(self, data):
+        """Detect the encoding of the file bytes."""
+        sample = data[: 64 * 1024]
 
         # Handle empty files
         if not len(sample):
             return "utf-8"  # Assume UTF-8 for empty files
 
+        encoding = self._bom_encoding(sample)
+        if encoding:
+            return encoding
+        try:
+            # Not final: the sample may end inside a multi-byte character
+            codecs.utf_8_decode(sample, "strict", False)
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass  # Rarely reached; only non-UTF-8 text needs full detection
+
         result = detect(sample)
         # Lower confidence threshold to 0.8
         return (
@@ -145,15 +541,9 @@ class RepositoryHandler:
             else None
         )
 
-    def _read_text_file(self, full_path, encoding):
-        """Read the text file with specified encoding."""
-        try:
-            with open(full_path, "r", encoding=encoding) as f:
-                return f.read()
-        except UnicodeDecodeError:
-            return "Binary file - contents omitted"
-
-    def __del__(self):
-        """Clean up temporary directory on object deletion."""
-        if self._temp_dir and os.path.exists(self._temp_dir):
-            shutil.rmtree(self._temp_dir, ignore_errors=True)
+    def _decode_text(self, data, encoding):
+        """Decode file bytes, translating newlines like text-mode reads."""
+        text = data.decode(encoding)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
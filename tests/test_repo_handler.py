@@ -0,0 +1,162 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repo_handler import MAX_FILE_SIZE, RepositoryHandler  # noqa: E402
+
+"""Tests for RepositoryHandler."""
+
+
+class SkipExtensionsTest(unittest.TestCase):
+    """skip_extensions drops whole extensions from the structure."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo_dir = self._tmp.name
+        for name in ("Cargo.lock", "padlock", "main.rs", "app.min.js"):
+            with open(os.path.join(self.repo_dir, name), "w") as f:
+                f.write("x\n")
+        subprocess.run(["git", "init", "-q", self.repo_dir], check=True)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _handler(self, skip_extensions):
+        handler = RepositoryHandler(self.repo_dir, skip_extensions=skip_extensions)
+        self.addCleanup(handler.close)
+        return handler
+
+    def test_bare_and_dotted_entries_match_whole_extensions(self):
+        handler = self._handler(["LOCK", ".min.js"])
+        self.assertEqual(
+            handler.get_repo_structure(), {"main.rs": None, "padlock": None}
+        )
+
+    def test_directory_walk_applies_the_same_rule(self):
+        handler = self._handler(["lock"])
+        self.assertEqual(
+            handler._walk_repo_structure(),
+            {"app.min.js": None, "main.rs": None, "padlock": None},
+        )
+
+    def test_nothing_is_skipped_by_default(self):
+        handler = self._handler(())
+        self.assertEqual(len(handler.get_repo_structure()), 4)
+
+
+class NestedRepositoryTest(unittest.TestCase):
+    """Nested repositories and submodules list their files, not themselves."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo_dir = self._tmp.name
+        self._git("init", "-q", self.repo_dir)
+        self._write("top.txt")
+        self._git("init", "-q", os.path.join(self.repo_dir, "nested"))
+        self._write("nested", "inner.txt")
+        module_dir = os.path.join(self.repo_dir, "module")
+        self._git("init", "-q", module_dir)
+        self._write("module", "mod.txt")
+        self._git("-C", module_dir, "add", "mod.txt")
+        self._git("-C", module_dir, "commit", "-qm", "init")
+        self._git("-C", self.repo_dir, "add", "top.txt", "module")  # Gitlink
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _git(self, *args):
+        env = dict(os.environ, GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@t")
+        env.update(GIT_COMMITTER_NAME="t", GIT_COMMITTER_EMAIL="t@t")
+        subprocess.run(["git", *args], check=True, capture_output=True, env=env)
+
+    def _write(self, *parts):
+        with open(os.path.join(self.repo_dir, *parts), "w") as f:
+            f.write("x\n")
+
+    def test_nested_repositories_are_expanded(self):
+        handler = RepositoryHandler(self.repo_dir)
+        self.addCleanup(handler.close)
+        self.assertEqual(
+            handler.get_repo_structure(),
+            {
+                "module": {"mod.txt": None},
+                "nested": {"inner.txt": None},
+                "top.txt": None,
+            },
+        )
+
+
+class FileContentTest(unittest.TestCase):
+    """get_file_content placeholders for files that are not shown."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo_dir = self._tmp.name
+        subprocess.run(["git", "init", "-q", self.repo_dir], check=True)
+        self.handler = RepositoryHandler(self.repo_dir)
+        self.addCleanup(self.handler.close)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, data):
+        with open(os.path.join(self.repo_dir, name), "wb") as f:
+            f.write(data)
+
+    def test_oversized_file_is_omitted_as_too_large(self):
+        self._write("big.txt", b"x" * (MAX_FILE_SIZE + 1))
+        self.assertEqual(
+            self.handler.get_file_content("big.txt"),
+            "File too large - contents omitted",
+        )
+
+    def test_file_at_the_limit_is_read(self):
+        self._write("edge.txt", b"x" * MAX_FILE_SIZE)
+        self.assertEqual(len(self.handler.get_file_content("edge.txt")), MAX_FILE_SIZE)
+
+    def test_file_grown_since_the_stat_is_read_whole(self):
+        self._write("grown.txt", b"abcdef")
+        full_path = os.path.join(self.repo_dir, "grown.txt")
+        content = self.handler._load_file_content("grown.txt", full_path, 3)
+        self.assertEqual(content, "abcdef")
+
+    def test_file_grown_past_the_limit_is_omitted(self):
+        self._write("grown.txt", b"x" * (MAX_FILE_SIZE + 1))
+        full_path = os.path.join(self.repo_dir, "grown.txt")
+        self.assertEqual(
+            self.handler._load_file_content("grown.txt", full_path, 10),
+            "File too large - contents omitted",
+        )
+
+    def test_batch_matches_single_reads(self):
+        self._write("a.txt", b"alpha\n")
+        self._write("b.bin", b"\x00\x01")
+        paths = ["a.txt", "b.bin", "missing.txt"]
+        self.assertEqual(
+            self.handler.get_file_contents_batch(paths, max_workers=2),
+            {
+                "a.txt": "alpha\n",
+                "b.bin": "Binary file - contents omitted",
+                "missing.txt": "Unreadable file - contents omitted",
+            },
+        )
+
+    def test_full_cache_keeps_earlier_entries(self):
+        names = [f"{i}.txt" for i in range(4)]
+        for name in names:
+            self._write(name, b"x" * 1000)
+        budget = 2 * sys.getsizeof("x" * 1000)
+        with mock.patch("repo_handler.CONTENT_CACHE_BYTES", budget):
+            first = [self.handler.get_file_content(name) for name in names]
+            second = [self.handler.get_file_content(name) for name in names]
+        hits = [a is b for a, b in zip(first, second)]
+        self.assertEqual(hits, [True, True, False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()